@@ -4,128 +4,141 @@ Example client for testing the metadata extraction API.
 
 import asyncio
 import httpx
-import json
+import orjson
 from pathlib import Path
 
 
-async def process_single_frame(image_path: str, api_url: str = "http://localhost:8000"):
+async def process_single_frame(
+    client: httpx.AsyncClient,
+    image_path: str,
+    pretty: bool = False
+):
     """
     Process a single camera frame and print results.
 
     Args:
+        client: Shared HTTP client pointed at the API server
         image_path: Path to image file
-        api_url: Base URL of the API server
+        pretty: Whether to indent the saved metadata JSON
     """
     print(f"\n{'='*60}")
     print(f"Processing: {image_path}")
     print(f"{'='*60}\n")
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            with open(image_path, 'rb') as f:
-                files = {'file': (Path(image_path).name, f, 'image/jpeg')}
-                response = await client.post(
-                    f'{api_url}/extract',
-                    files=files
-                )
-                response.raise_for_status()
-
-            metadata = response.json()
-
-            # Pretty print results
-            print(f"Scene Type: {metadata['scene_type']} (confidence: {metadata['scene_confidence']:.2f})")
-            print(f"Frame Quality: {metadata['frame_quality_score']:.2f}")
-            print(f"Lighting: {metadata['lighting_quality']}")
-            print(f"Motion Blur: {metadata['motion_blur_detected']}")
-
-            if metadata['text_detected']:
-                print(f"\nDetected Text ({len(metadata['text_detected'])} items):")
-                for text_item in metadata['text_detected']:
-                    print(f"  - '{text_item['text']}' (confidence: {text_item['confidence']:.2f})")
-            else:
-                print("\nNo text detected")
-
-            if metadata['landmarks']:
-                print(f"\nLandmarks ({len(metadata['landmarks'])} items):")
-                for landmark in metadata['landmarks']:
-                    print(f"  - {landmark['type']}: {landmark['direction']} / {landmark['distance']} (confidence: {landmark['confidence']:.2f})")
-                    if landmark.get('additional_info'):
-                        print(f"    Info: {landmark['additional_info']}")
-            else:
-                print("\nNo landmarks detected")
-
-            if metadata.get('processing_notes'):
-                print(f"\nNotes: {metadata['processing_notes']}")
-
-            # Save full JSON
-            output_file = Path(image_path).stem + "_metadata.json"
-            with open(output_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
-            print(f"\nFull metadata saved to: {output_file}")
-
-        except httpx.HTTPStatusError as e:
-            print(f"HTTP Error: {e.response.status_code}")
-            print(f"Response: {e.response.text}")
-        except Exception as e:
-            print(f"Error: {e}")
-
-
-async def process_batch(image_paths: list[str], api_url: str = "http://localhost:8000"):
+    try:
+        # Send the frame as the raw body to skip multipart encoding
+        response = await client.post(
+            '/extract/raw',
+            content=await asyncio.to_thread(Path(image_path).read_bytes),
+            headers={'Content-Type': 'image/jpeg'}
+        )
+        response.raise_for_status()
+
+        metadata = response.json()
+
+        # Pretty print results
+        print(f"Scene Type: {metadata['scene_type']} (confidence: {metadata['scene_confidence']:.2f})")
+        print(f"Frame Quality: {metadata['frame_quality_score']:.2f}")
+        print(f"Lighting: {metadata['lighting_quality']}")
+        print(f"Motion Blur: {metadata['motion_blur_detected']}")
+
+        if metadata['text_detected']:
+            print(f"\nDetected Text ({len(metadata['text_detected'])} items):")
+            for text_item in metadata['text_detected']:
+                print(f"  - '{text_item['text']}' (confidence: {text_item['confidence']:.2f})")
+        else:
+            print("\nNo text detected")
+
+        if metadata['landmarks']:
+            print(f"\nLandmarks ({len(metadata['landmarks'])} items):")
+            for landmark in metadata['landmarks']:
+                print(f"  - {landmark['type']}: {landmark['direction']} / {landmark['distance']} (confidence: {landmark['confidence']:.2f})")
+                if landmark.get('additional_info'):
+                    print(f"    Info: {landmark['additional_info']}")
+        else:
+            print("\nNo landmarks detected")
+
+        if metadata.get('processing_notes'):
+            print(f"\nNotes: {metadata['processing_notes']}")
+
+        # Save full JSON
+        output_file = Path(image_path).stem + "_metadata.json"
+        Path(output_file).write_bytes(
+            orjson.dumps(metadata, option=orjson.OPT_INDENT_2 if pretty else 0)
+        )
+        print(f"\nFull metadata saved to: {output_file}")
+
+    except httpx.HTTPStatusError as e:
+        print(f"HTTP Error: {e.response.status_code}")
+        print(f"Response: {e.response.text}")
+    except Exception as e:
+        print(f"Error: {e}")
+
+
+async def process_batch(
+    client: httpx.AsyncClient,
+    image_paths: list[str],
+    max_in_flight: int = 8
+):
     """
-    Process multiple frames in batch.
+    Process multiple frames as concurrent single-frame requests.
+
+    Each frame is posted on its own, so the server starts on the first frame
+    while later ones are still uploading.
 
     Args:
+        client: Shared HTTP client pointed at the API server
         image_paths: List of image file paths
-        api_url: Base URL of the API server
+        max_in_flight: Maximum concurrent uploads
     """
     print(f"\n{'='*60}")
     print(f"Batch Processing: {len(image_paths)} frames")
     print(f"{'='*60}\n")
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            files = []
-            for path in image_paths:
-                with open(path, 'rb') as f:
-                    files.append(
-                        ('files', (Path(path).name, f.read(), 'image/jpeg'))
-                    )
+    semaphore = asyncio.Semaphore(max_in_flight)
 
+    async def process_one(path: str) -> dict:
+        async with semaphore:
             response = await client.post(
-                f'{api_url}/extract/batch',
-                files=files
+                '/extract/raw',
+                content=await asyncio.to_thread(Path(path).read_bytes),
+                headers={'Content-Type': 'image/jpeg'}
             )
             response.raise_for_status()
-
-            results = response.json()
-
-            print(f"Processed {len(results)} frames\n")
-
-            for i, metadata in enumerate(results):
-                print(f"Frame {i+1}: {image_paths[i]}")
-                print(f"  Scene: {metadata['scene_type']} ({metadata['scene_confidence']:.2f})")
-                print(f"  Text items: {len(metadata['text_detected'])}")
-                print(f"  Landmarks: {len(metadata['landmarks'])}")
-                print(f"  Quality: {metadata['frame_quality_score']:.2f}\n")
-
-        except httpx.HTTPStatusError as e:
-            print(f"HTTP Error: {e.response.status_code}")
-            print(f"Response: {e.response.text}")
-        except Exception as e:
-            print(f"Error: {e}")
-
-
-async def health_check(api_url: str = "http://localhost:8000"):
+            return response.json()
+
+    results = await asyncio.gather(
+        *(process_one(path) for path in image_paths),
+        return_exceptions=True
+    )
+
+    processed = sum(1 for result in results if not isinstance(result, Exception))
+    print(f"Processed {processed}/{len(results)} frames\n")
+
+    for i, metadata in enumerate(results):
+        print(f"Frame {i+1}: {image_paths[i]}")
+        if isinstance(metadata, httpx.HTTPStatusError):
+            print(f"  HTTP Error: {metadata.response.status_code}")
+            print(f"  Response: {metadata.response.text}\n")
+        elif isinstance(metadata, Exception):
+            print(f"  Error: {metadata}\n")
+        else:
+            print(f"  Scene: {metadata['scene_type']} ({metadata['scene_confidence']:.2f})")
+            print(f"  Text items: {len(metadata['text_detected'])}")
+            print(f"  Landmarks: {len(metadata['landmarks'])}")
+            print(f"  Quality: {metadata['frame_quality_score']:.2f}\n")
+
+
+async def health_check(client: httpx.AsyncClient):
     """Check if the API server is running."""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{api_url}/health")
-            response.raise_for_status()
-            print(f"✓ Server is healthy: {response.json()}")
-            return True
-        except Exception as e:
-            print(f"✗ Server health check failed: {e}")
-            return False
+    try:
+        response = await client.get("/health")
+        response.raise_for_status()
+        print(f"✓ Server is healthy: {response.json()}")
+        return True
+    except Exception as e:
+        print(f"✗ Server health check failed: {e}")
+        return False
 
 
 async def main():
@@ -134,32 +147,39 @@ async def main():
 
     api_url = "http://localhost:8000"
 
-    # Check server health
-    if not await health_check(api_url):
-        print("\nMake sure the API server is running:")
-        print("  python -m src.api")
-        return
-
-    # Check command line arguments
-    if len(sys.argv) < 2:
-        print("\nUsage:")
-        print("  Single frame: python test_client.py /path/to/image.jpg")
-        print("  Batch:        python test_client.py /path/to/img1.jpg /path/to/img2.jpg ...")
-        return
-
-    image_paths = sys.argv[1:]
-
-    # Validate files exist
-    for path in image_paths:
-        if not Path(path).exists():
-            print(f"Error: File not found: {path}")
+    # One pooled client for every request, so connections are reused
+    async with httpx.AsyncClient(
+        base_url=api_url,
+        timeout=httpx.Timeout(30.0),
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    ) as client:
+        # Check server health
+        if not await health_check(client):
+            print("\nMake sure the API server is running:")
+            print("  python -m src.api")
+            return
+
+        # Check command line arguments
+        if len(sys.argv) < 2:
+            print("\nUsage:")
+            print("  Single frame: python test_client.py /path/to/image.jpg")
+            print("  Batch:        python test_client.py /path/to/img1.jpg /path/to/img2.jpg ...")
             return
 
-    # Process
-    if len(image_paths) == 1:
-        await process_single_frame(image_paths[0], api_url)
-    else:
-        await process_batch(image_paths, api_url)
+        image_paths = sys.argv[1:]
+
+        # Validate files exist
+        for path in image_paths:
+            if not Path(path).exists():
+                print(f"Error: File not found: {path}")
+                return
+
+        # Process
+        if len(image_paths) == 1:
+            await process_single_frame(client, image_paths[0])
+        else:
+            await process_batch(client, image_paths)
 
 
 if __name__ == "__main__":
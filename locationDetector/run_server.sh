@@ -83,6 +83,7 @@ echo ""
 echo "Endpoints:"
 echo "  GET  /health         - Health check"
 echo "  POST /extract        - Extract metadata from single frame"
+echo "  POST /extract/raw    - Extract metadata from single frame (raw body)"
 echo "  POST /extract/batch  - Extract metadata from multiple frames"
 echo "  GET  /schema         - Get JSON schema"
 echo ""
@@ -4,39 +4,119 @@ Provides endpoints for smartphone apps to submit camera frames.
 """
 
 from pathlib import Path
-import json
-from datetime import datetime
-import glob
+import asyncio
+import os
+import hashlib
+import logging
+import threading
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, status, Body
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, status, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from contextlib import asynccontextmanager
+from cachetools import LRUCache, TTLCache
+import orjson
 import structlog
-from typing import Optional
-from pydantic import BaseModel
+from typing import BinaryIO, Optional
+from pydantic import BaseModel, TypeAdapter
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from src.config import get_settings
 from src.metadata_extractor import MetadataExtractionService
 from src.models import IndoorMetadata
 
-# Configure structured logging
+# Configure structured logging (rendered with orjson straight to bytes)
 structlog.configure(
     processors=[
         structlog.processors.add_log_level,
         structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.JSONRenderer()
-    ]
+        structlog.processors.JSONRenderer(serializer=orjson.dumps)
+    ],
+    # Calls below the level are no-ops that skip the processor chain; the
+    # level is set from settings at startup, before anything is logged
+    wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
+    logger_factory=structlog.BytesLoggerFactory(),
+    cache_logger_on_first_use=True
 )
 
 logger = structlog.get_logger()
 
+
+class _ObservationHandleCache(LRUCache):
+    """LRU of open observation log handles that closes a handle it evicts."""
+
+    def popitem(self):
+        device_id, handle = super().popitem()
+        handle.close()
+        return device_id, handle
+
+
 # Global service instance
 extraction_service: Optional[MetadataExtractionService] = None
 
+# Serializer for batch responses, built once instead of per request
+BATCH_RESULTS_ADAPTER = TypeAdapter(list[IndoorMetadata])
+
+# Observation count and latest observation per device, kept current by
+# save/clear so neither saves nor /devices need to read the logs
+device_state: dict[str, dict] = {}
+
+# Per-device locks that serialize appends to each observation log
+observation_locks: dict[str, asyncio.Lock] = {}
+
+# Parsed observation logs, reused while a log's (mtime, size) is unchanged.
+# Bounded since device ids come from clients; reads run in worker threads,
+# so access goes through the lock
+OBSERVATION_LOG_CACHE_SIZE = 64
+observation_log_cache: LRUCache = LRUCache(maxsize=OBSERVATION_LOG_CACHE_SIZE)
+observation_log_cache_lock = threading.Lock()
+
+# Append-mode handles kept open for recently active devices. Bounded since
+# device ids come from clients; appends run in worker threads, so access goes
+# through the lock, which also keeps eviction from closing a handle mid-write
+OBSERVATION_HANDLE_CACHE_SIZE = 128
+observation_handles: LRUCache = _ObservationHandleCache(maxsize=OBSERVATION_HANDLE_CACHE_SIZE)
+observation_handles_lock = threading.Lock()
+
 # Observations directory
 OBSERVATIONS_DIR = Path(__file__).resolve().parent.parent / "observations"
 
+# Bytes read from the end of a log to find its latest record at startup
+OBSERVATION_TAIL_BYTES = 4096
+
+# Static HTML pages, loaded into memory at startup
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+STATIC_PAGES = ("overshoot-livestream.html", "dashboard.html", "livestream-test.html")
+
+# Pages above this size are streamed with FileResponse (sendfile-capable) instead
+STATIC_CACHE_MAX_BYTES = 256 * 1024
+
+# Recent single-frame results keyed by image SHA-256, for replayed frames
+RESULT_CACHE_SIZE = 1024
+RESULT_CACHE_TTL = 60  # seconds
+
+# Upload read size; frames are streamed in chunks so oversized uploads fail fast
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Maximum number of frames accepted by /extract/batch
+MAX_BATCH_FRAMES = 50
+
+# Upload routes and how many frames' worth of bytes their request body may hold
+UPLOAD_ROUTE_FRAME_LIMITS = {
+    "/extract": 1,
+    "/extract/raw": 1,
+    "/extract/batch": MAX_BATCH_FRAMES,
+}
+
+# Upload routes that expect a multipart/form-data body
+MULTIPART_UPLOAD_ROUTES = {"/extract", "/extract/batch"}
+
+# Allowance per frame for multipart boundaries and part headers, so a file
+# just under the limit isn't rejected by its request's Content-Length
+MULTIPART_FRAME_OVERHEAD = 16 * 1024
+
 
 class ObservationData(BaseModel):
     """Combined GPS + metadata observation."""
@@ -48,6 +128,261 @@ class ObservationData(BaseModel):
     metadata: dict  # Overshoot metadata
 
 
+def _file_too_large(max_size: int) -> HTTPException:
+    """Build the 413 error raised for oversized uploads."""
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Maximum size: {max_size // (1024 * 1024)}MB"
+    )
+
+
+async def _read_upload(file: UploadFile, max_size: int) -> bytearray:
+    """
+    Read an uploaded file into a single buffer, aborting once it exceeds max_size.
+
+    Args:
+        file: Uploaded image file
+        max_size: Maximum allowed size in bytes
+
+    Returns:
+        Raw image bytes
+
+    Raises:
+        HTTPException: If the file is larger than max_size
+    """
+    # Reject oversized uploads before touching their contents
+    if file.size is not None and file.size > max_size:
+        raise _file_too_large(max_size)
+
+    if file.size is not None and hasattr(file.file, "readinto"):
+        # Size is known up front, so fill a preallocated buffer in one pass
+        buffer = bytearray(file.size)
+        read = await asyncio.to_thread(file.file.readinto, buffer)
+        del buffer[read:]
+        return buffer
+
+    buffer = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buffer += chunk
+        if len(buffer) > max_size:
+            raise _file_too_large(max_size)
+    return buffer
+
+
+async def _read_body(request: Request, max_size: int) -> bytearray:
+    """
+    Read a raw request body as it streams in, aborting once it exceeds max_size.
+
+    Args:
+        request: Incoming request whose body is the image
+        max_size: Maximum allowed size in bytes
+
+    Returns:
+        Raw image bytes
+
+    Raises:
+        HTTPException: If the body is larger than max_size
+    """
+    buffer = bytearray()
+    async for chunk in request.stream():
+        buffer += chunk
+        if len(buffer) > max_size:
+            raise _file_too_large(max_size)
+    return buffer
+
+
+async def _process_frame_cached(request: Request, image_data: bytearray) -> IndoorMetadata:
+    """
+    Process a frame, short-circuiting on an identical frame seen within the
+    result cache TTL.
+    """
+    cache = request.app.state.result_cache
+    if cache is None:
+        return await extraction_service.process_frame(image_data)
+
+    digest = hashlib.sha256(image_data).digest()
+    metadata = cache.get(digest)
+    if metadata is not None:
+        logger.info("frame_result_cache_hit", size_kb=len(image_data) / 1024)
+        return metadata
+
+    metadata = await extraction_service.process_frame(image_data)
+    # A retried frame should get a fresh attempt, not the cached failure
+    if not extraction_service.is_fallback(metadata):
+        cache[digest] = metadata
+    return metadata
+
+
+async def _process_frame_bounded(request: Request, image_data: bytearray) -> IndoorMetadata:
+    """Process a batch frame once a slot under the extraction semaphore frees up."""
+    async with request.app.state.extract_sem:
+        return await extraction_service.process_frame_or_fallback(image_data)
+
+
+async def _read_and_process_frame(request: Request, file: UploadFile, max_size: int) -> IndoorMetadata:
+    """Read one batch upload and extract its metadata under the frame limit."""
+    image_data = await _read_upload(file, max_size)
+    return await _process_frame_bounded(request, image_data)
+
+
+def _etag(content: bytes) -> str:
+    """Compute a strong ETag for a static response body."""
+    return f'"{hashlib.md5(content).hexdigest()}"'
+
+
+def _cached_response(
+    request: Request,
+    content: bytes,
+    etag: str,
+    media_type: str,
+    max_age: int
+) -> Response:
+    """
+    Serve a precomputed body with caching headers, answering 304 when the
+    client's If-None-Match already matches.
+    """
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+def _observation_lock(device_id: str) -> asyncio.Lock:
+    """Get the lock serializing writes to one device's observation log."""
+    lock = observation_locks.get(device_id)
+    if lock is None:
+        lock = observation_locks[device_id] = asyncio.Lock()
+    return lock
+
+
+def _device_file(device_id: str) -> Path:
+    """Get the append-only observation log for a device."""
+    return OBSERVATIONS_DIR / f"observations_{device_id}.jsonl"
+
+
+def _serialize_observation(observation: dict) -> bytes:
+    """Serialize an observation as a single JSONL record."""
+    return orjson.dumps(observation, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def _read_observations(path: Path) -> list[dict]:
+    """Read all observations from a JSONL observation log."""
+    with open(path, 'rb') as f:
+        return [orjson.loads(line) for line in f if line.strip()]
+
+
+def _read_observations_cached(path: Path) -> list[dict]:
+    """
+    Read a JSONL observation log, serving the previously parsed list while
+    the file is unchanged. Size is part of the key since appends can land
+    within one mtime tick.
+    """
+    stat = path.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    with observation_log_cache_lock:
+        cached = observation_log_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    observations = _read_observations(path)
+    with observation_log_cache_lock:
+        observation_log_cache[path] = (key, observations)
+    return observations
+
+
+def _append_observation(device_id: str, line: bytes) -> None:
+    """Append one serialized observation to a device's JSONL log."""
+    with observation_handles_lock:
+        handle = observation_handles.get(device_id)
+        if handle is None:
+            # Unbuffered, so every record is a single write() visible to readers
+            handle = open(_device_file(device_id), 'ab', buffering=0)
+            observation_handles[device_id] = handle
+        handle.write(line)
+
+
+def _close_observation_handle(device_id: str) -> None:
+    """Close a device's open observation log handle, if any."""
+    with observation_handles_lock:
+        handle = observation_handles.pop(device_id, None)
+    if handle is not None:
+        handle.close()
+
+
+def _delete_observation_log(device_id: str) -> bool:
+    """Close and remove a device's observation log. Returns whether it existed."""
+    _close_observation_handle(device_id)
+    device_file = _device_file(device_id)
+    with observation_log_cache_lock:
+        observation_log_cache.pop(device_file, None)
+    if not device_file.exists():
+        return False
+    device_file.unlink()
+    return True
+
+
+def _list_observation_logs() -> list[Path]:
+    """List the per-device JSONL observation logs."""
+    with os.scandir(OBSERVATIONS_DIR) as entries:
+        return [
+            Path(entry.path) for entry in entries
+            if entry.name.startswith("observations_") and entry.name.endswith(".jsonl")
+        ]
+
+
+def _read_last_observation(f: BinaryIO, size: int) -> Optional[dict]:
+    """Parse the final record of an open log by reading backwards from EOF."""
+    window = OBSERVATION_TAIL_BYTES
+    while True:
+        start = max(0, size - window)
+        f.seek(start)
+        lines = f.read().split(b"\n")
+        # The first line is partial unless the read began at the start of the file
+        records = [line for line in lines[1 if start else 0:] if line.strip()]
+        if records:
+            return orjson.loads(records[-1])
+        if start == 0:
+            return None
+        window *= 2
+
+
+async def _read_all_observations() -> dict[str, list[dict]]:
+    """Read the observation logs of every device in parallel, keyed by device ID."""
+    files = await asyncio.to_thread(_list_observation_logs)
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_read_observations_cached, file) for file in files)
+    )
+    return {
+        file.stem.replace("observations_", ""): observations
+        for file, observations in zip(files, results)
+    }
+
+
+def _load_device_state() -> dict[str, dict]:
+    """
+    Build the in-memory count/latest index from the stored logs, converting
+    any legacy observations_<device_id>.json arrays to JSONL logs on the way.
+    """
+    for legacy_file in OBSERVATIONS_DIR.glob("observations_*.json"):
+        with open(legacy_file, 'rb') as f:
+            observations = orjson.loads(f.read())
+        with open(legacy_file.with_suffix(".jsonl"), 'ab') as f:
+            f.write(b"".join(_serialize_observation(obs) for obs in observations))
+        legacy_file.unlink()
+
+    # Count records without parsing them; only the last one is decoded
+    state = {}
+    for log_file in _list_observation_logs():
+        with open(log_file, 'rb') as f:
+            count = sum(1 for line in f if line.strip())
+            if count:
+                state[log_file.stem.replace("observations_", "")] = {
+                    "count": count,
+                    "latest": _read_last_observation(f, f.tell())
+                }
+    return state
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager for setup and cleanup."""
@@ -55,18 +390,53 @@ async def lifespan(app: FastAPI):
 
     settings = get_settings()
 
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(
+            logging.getLevelName(settings.log_level.upper())
+        )
+    )
+
+    # Resolve per-request settings once instead of on every frame
+    app.state.settings = settings
+    app.state.max_bytes = settings.max_image_size_mb * 1024 * 1024
+    app.state.debug = settings.api_debug
+
+    # Bound how many batch frames are in flight at the extractor at once
+    app.state.extract_sem = asyncio.Semaphore(settings.max_concurrent_frames)
+
+    # Identical frames resubmitted within the TTL reuse the earlier result
+    app.state.result_cache = (
+        TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+        if settings.enable_caching else None
+    )
+
+    # The output schema is static, so encode it once for /schema
+    app.state.schema_bytes = orjson.dumps(IndoorMetadata.model_json_schema())
+    app.state.schema_etag = _etag(app.state.schema_bytes)
+
+    # Small pages are polled often, so keep them in memory
+    app.state.static_pages = {}
+    for name in STATIC_PAGES:
+        path = STATIC_DIR / name
+        if path.stat().st_size <= STATIC_CACHE_MAX_BYTES:
+            content = await asyncio.to_thread(path.read_bytes)
+            app.state.static_pages[name] = (content, _etag(content))
+
     # Startup
     logger.info("starting_metadata_extraction_service")
     extraction_service = MetadataExtractionService(settings)
 
     # Create observations directory if it doesn't exist
     OBSERVATIONS_DIR.mkdir(exist_ok=True)
+    device_state.update(await asyncio.to_thread(_load_device_state))
     logger.info("observations_directory_ready", path=str(OBSERVATIONS_DIR))
 
     yield
 
     # Shutdown
     logger.info("shutting_down_metadata_extraction_service")
+    for device_id in list(observation_handles):
+        _close_observation_handle(device_id)
     if extraction_service:
         await extraction_service.close()
 
@@ -76,36 +446,111 @@ app = FastAPI(
     title="Indoor Localization Metadata Extraction API",
     description="Extract structured metadata from smartphone camera frames for indoor navigation",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Compress larger JSON bodies (batch results, observation lists, schema);
+# small single-frame responses stay below minimum_size and go out as-is.
+# Added first so it sits innermost and sees each route's complete body.
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=4)
+
+
+class RejectInvalidUploadsMiddleware:
+    """
+    Reject uploads from their headers alone, before the body is buffered.
+    Plain ASGI, so every other request passes straight through.
+    Registered ahead of CORS so rejections still carry CORS headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["method"] == "POST":
+            response = self._reject(scope)
+            if response is not None:
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _reject(scope: Scope) -> Optional[Response]:
+        """Build the rejection for an upload request, or None to let it through."""
+        path = scope["path"]
+        frame_limit = UPLOAD_ROUTE_FRAME_LIMITS.get(path)
+        if frame_limit is None:
+            return None
+
+        headers = dict(scope["headers"])
+        frame_max = scope["app"].state.max_bytes
+        if path in MULTIPART_UPLOAD_ROUTES:
+            content_type = headers.get(b"content-type", b"").split(b";")[0].strip().decode("latin-1")
+            if content_type != "multipart/form-data":
+                return ORJSONResponse(
+                    status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                    content={"detail": f"Expected multipart/form-data, got {content_type or 'no content type'}"}
+                )
+            max_size = frame_limit * (frame_max + MULTIPART_FRAME_OVERHEAD)
+        else:
+            max_size = frame_limit * frame_max
+
+        content_length = headers.get(b"content-length", b"0")
+        if content_length.isdigit() and int(content_length) > max_size:
+            return ORJSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": f"Request too large. Maximum size: {frame_limit * frame_max // (1024 * 1024)}MB"}
+            )
+        return None
+
+
+app.add_middleware(RejectInvalidUploadsMiddleware)
+
 # Configure CORS for mobile app access
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Configure this properly for production
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Every route is GET or POST; listing them (and the headers clients send)
+    # lets Starlette answer preflights from fixed values, and max_age lets
+    # browsers reuse a preflight for a day instead of repeating it per upload
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "If-None-Match"],
+    max_age=86400,
 )
 
 
+def _static_page(request: Request, name: str) -> Response:
+    """Serve one of the static HTML pages, from memory when cached at startup."""
+    cached = request.app.state.static_pages.get(name)
+    if cached is None:
+        # Large pages go through FileResponse, which can hand the file to the
+        # server's zero-copy sendfile path instead of copying it into memory
+        return FileResponse(STATIC_DIR / name, media_type="text/html")
+
+    content, etag = cached
+    return _cached_response(request, content, etag, media_type="text/html", max_age=300)
+
+
 @app.get("/")
-async def overshoot_livestream_page():
+async def overshoot_livestream_page(request: Request):
     """Serve the Overshoot live video streaming page."""
-    path = Path(__file__).resolve().parent.parent / "static" / "overshoot-livestream.html"
-    return FileResponse(path)
+    return _static_page(request, "overshoot-livestream.html")
 
 @app.get("/dashboard")
-async def dashboard_page():
+async def dashboard_page(request: Request):
     """Serve the multi-device tracking dashboard."""
-    path = Path(__file__).resolve().parent.parent / "static" / "dashboard.html"
-    return FileResponse(path)
+    return _static_page(request, "dashboard.html")
 
 @app.get("/test-simple")
-async def simple_test_page():
+async def simple_test_page(request: Request):
     """Serve the simple test page (periodic image capture → /extract)."""
-    path = Path(__file__).resolve().parent.parent / "static" / "livestream-test.html"
-    return FileResponse(path)
+    return _static_page(request, "livestream-test.html")
+
+
+# Everything under static/ is also reachable directly; StaticFiles answers
+# conditional requests itself and streams files without per-route code
+app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 
 @app.get("/health")
@@ -120,7 +565,8 @@ async def health_check():
 
 @app.post(
     "/extract",
-    response_model=IndoorMetadata,
+    response_model=None,
+    responses={200: {"model": IndoorMetadata}},
     status_code=status.HTTP_200_OK,
     summary="Extract metadata from camera frame",
     description="""
@@ -133,16 +579,18 @@ async def health_check():
     """
 )
 async def extract_metadata(
+    request: Request,
     file: UploadFile = File(..., description="Camera frame image from smartphone")
-) -> IndoorMetadata:
+) -> Response:
     """
     Extract indoor metadata from a smartphone camera frame.
 
     Args:
+        request: Incoming request, used to reach app-level settings
         file: Uploaded image file
 
     Returns:
-        IndoorMetadata object with scene classification, landmarks, text, etc.
+        IndoorMetadata JSON with scene classification, landmarks, text, etc.
 
     Raises:
         HTTPException: If image is invalid or processing fails
@@ -161,17 +609,8 @@ async def extract_metadata(
         )
 
     try:
-        # Read image data
-        image_data = await file.read()
-
-        # Validate file size
-        settings = get_settings()
-        max_size = settings.max_image_size_mb * 1024 * 1024
-        if len(image_data) > max_size:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File too large. Maximum size: {settings.max_image_size_mb}MB"
-            )
+        # Stream image data, rejecting oversized files mid-upload
+        image_data = await _read_upload(file, request.app.state.max_bytes)
 
         logger.info(
             "processing_frame_request",
@@ -181,9 +620,79 @@ async def extract_metadata(
         )
 
         # Process frame
-        metadata = await extraction_service.process_frame(image_data)
+        metadata = await _process_frame_cached(request, image_data)
 
-        return metadata
+        # Already validated by the extractor, so serialize directly
+        return Response(content=metadata.model_dump_json(), media_type="application/json")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("frame_processing_error", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process frame: {str(e)}"
+        )
+
+
+@app.post(
+    "/extract/raw",
+    response_model=None,
+    responses={200: {"model": IndoorMetadata}},
+    status_code=status.HTTP_200_OK,
+    summary="Extract metadata from a raw camera frame body",
+    description="""
+    Send a single camera frame as the raw request body and receive structured metadata.
+
+    Set Content-Type to the image type (e.g. image/jpeg) or application/octet-stream.
+    Avoids multipart encoding and parsing for single-frame uploads.
+    Maximum body size: 10MB (configurable).
+
+    Returns strict JSON matching IndoorMetadata schema.
+    """
+)
+async def extract_metadata_raw(request: Request) -> Response:
+    """
+    Extract indoor metadata from a camera frame sent as the raw request body.
+
+    Args:
+        request: Incoming request whose body is the image
+
+    Returns:
+        IndoorMetadata JSON with scene classification, landmarks, text, etc.
+
+    Raises:
+        HTTPException: If image is invalid or processing fails
+    """
+    if not extraction_service:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Extraction service not initialized"
+        )
+
+    # Validate body type
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if not content_type.startswith("image/") and content_type != "application/octet-stream":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid content type. Expected image, got {content_type or None}"
+        )
+
+    try:
+        # Stream body, rejecting oversized frames mid-upload
+        image_data = await _read_body(request, request.app.state.max_bytes)
+
+        logger.info(
+            "processing_raw_frame_request",
+            content_type=content_type,
+            size_kb=len(image_data) / 1024
+        )
+
+        # Process frame
+        metadata = await _process_frame_cached(request, image_data)
+
+        # Already validated by the extractor, so serialize directly
+        return Response(content=metadata.model_dump_json(), media_type="application/json")
 
     except HTTPException:
         raise
@@ -197,7 +706,8 @@ async def extract_metadata(
 
 @app.post(
     "/extract/batch",
-    response_model=list[IndoorMetadata],
+    response_model=None,
+    responses={200: {"model": list[IndoorMetadata]}},
     status_code=status.HTTP_200_OK,
     summary="Extract metadata from multiple frames",
     description="""
@@ -208,16 +718,18 @@ async def extract_metadata(
     """
 )
 async def extract_metadata_batch(
+    request: Request,
     files: list[UploadFile] = File(..., description="Multiple camera frame images")
-) -> list[IndoorMetadata]:
+) -> Response:
     """
     Extract metadata from multiple camera frames in batch.
 
     Args:
+        request: Incoming request, used to reach app-level settings
         files: List of uploaded image files
 
     Returns:
-        List of IndoorMetadata objects, one per frame
+        JSON list of IndoorMetadata objects, one per frame
 
     Raises:
         HTTPException: If processing fails
@@ -228,29 +740,52 @@ async def extract_metadata_batch(
             detail="Extraction service not initialized"
         )
 
-    if len(files) > 50:
+    if len(files) > MAX_BATCH_FRAMES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Maximum 50 frames per batch request"
+            detail=f"Maximum {MAX_BATCH_FRAMES} frames per batch request"
         )
 
+    tasks: list[asyncio.Task] = []
     try:
-        # Read all files
-        frames_data = []
-        for file in files:
-            if not file.content_type or not file.content_type.startswith("image/"):
-                continue  # Skip non-image files
-            image_data = await file.read()
-            frames_data.append(image_data)
-
-        logger.info("processing_batch_request", frame_count=len(frames_data))
-
-        # Process batch
-        results = await extraction_service.process_frame_batch(frames_data)
-
-        return results
+        max_size = request.app.state.max_bytes
+        frames = [
+            file for file in files
+            if file.content_type and file.content_type.startswith("image/")
+        ]
+
+        # Sizes are known once the multipart body is parsed, so an oversized
+        # frame rejects the batch before any extraction is spent on the rest
+        for file in frames:
+            if file.size is not None and file.size > max_size:
+                raise _file_too_large(max_size)
+
+        # Read and dispatch every frame concurrently so uploads are drained
+        # in parallel and extraction starts as soon as each one is read
+        tasks = [
+            asyncio.create_task(_read_and_process_frame(request, file, max_size))
+            for file in frames
+        ]
+
+        logger.info("processing_batch_request", frame_count=len(tasks))
+
+        # Extraction failures come back as fallback metadata, so only a
+        # failed read (e.g. an oversized frame of undeclared size) raises here,
+        # rejecting the whole batch and cancelling the remaining frames
+        results = await asyncio.gather(*tasks)
+
+        return Response(
+            content=BATCH_RESULTS_ADAPTER.dump_json(results),
+            media_type="application/json"
+        )
 
+    except HTTPException:
+        for task in tasks:
+            task.cancel()
+        raise
     except Exception as e:
+        for task in tasks:
+            task.cancel()
         logger.error("batch_processing_error", error=str(e))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -259,44 +794,45 @@ async def extract_metadata_batch(
 
 
 @app.get("/schema")
-async def get_schema():
+async def get_schema(request: Request):
     """
     Get the JSON schema for IndoorMetadata output.
 
     Useful for client applications to understand the expected response format.
+    Served from the copy encoded at startup, with an ETag for revalidation.
     """
-    return IndoorMetadata.model_json_schema()
+    return _cached_response(
+        request,
+        request.app.state.schema_bytes,
+        request.app.state.schema_etag,
+        media_type="application/json",
+        max_age=3600
+    )
 
 
 @app.post("/save_observation")
 async def save_observation(observation: ObservationData = Body(...)):
     """
-    Save a combined GPS + metadata observation to device-specific JSON file.
-    Each device gets its own observations_<device_id>.json file.
+    Save a combined GPS + metadata observation to device-specific JSONL file.
+    Each device gets its own append-only observations_<device_id>.jsonl file.
     """
     try:
         device_id = observation.device_id
-        device_file = OBSERVATIONS_DIR / f"observations_{device_id}.json"
-
-        # Read existing observations or create new list
-        observations = []
-        if device_file.exists():
-            with open(device_file, 'r') as f:
-                observations = json.load(f)
+        record = observation.model_dump()
+        line = _serialize_observation(record)
 
-        # Append new observation
-        observations.append(observation.model_dump())
+        # Append a single record instead of rewriting the whole file
+        async with _observation_lock(device_id):
+            await asyncio.to_thread(_append_observation, device_id, line)
+            count = device_state.get(device_id, {"count": 0})["count"] + 1
+            device_state[device_id] = {"count": count, "latest": record}
 
-        # Write back to file
-        with open(device_file, 'w') as f:
-            json.dump(observations, f, indent=2)
-
-        logger.info("observation_saved", device_id=device_id, count=len(observations))
+        logger.info("observation_saved", device_id=device_id, count=count)
 
         return {
             "status": "success",
             "device_id": device_id,
-            "total_observations": len(observations)
+            "total_observations": count
         }
 
     except Exception as e:
@@ -314,10 +850,10 @@ async def clear_observations(device_id: str):
     Called when user stops the stream.
     """
     try:
-        device_file = OBSERVATIONS_DIR / f"observations_{device_id}.json"
-        if device_file.exists():
-            device_file.unlink()
-            logger.info("observations_cleared", device_id=device_id)
+        async with _observation_lock(device_id):
+            device_state.pop(device_id, None)
+            if await asyncio.to_thread(_delete_observation_log, device_id):
+                logger.info("observations_cleared", device_id=device_id)
 
         return {"status": "success", "message": f"Observations cleared for device {device_id}"}
 
@@ -335,12 +871,11 @@ async def get_observations(device_id: str):
     Get all saved observations for a specific device.
     """
     try:
-        device_file = OBSERVATIONS_DIR / f"observations_{device_id}.json"
-        if not device_file.exists():
+        device_file = _device_file(device_id)
+        if not await asyncio.to_thread(device_file.exists):
             return {"device_id": device_id, "observations": [], "count": 0}
 
-        with open(device_file, 'r') as f:
-            observations = json.load(f)
+        observations = await asyncio.to_thread(_read_observations_cached, device_file)
 
         return {"device_id": device_id, "observations": observations, "count": len(observations)}
 
@@ -355,32 +890,23 @@ async def get_observations(device_id: str):
 @app.get("/devices")
 async def list_devices():
     """
-    List all active devices (devices with observation files).
+    List all active devices (devices with observation logs).
     Returns device IDs and their latest GPS coordinates.
     """
     try:
         devices = []
-        observation_files = glob.glob(str(OBSERVATIONS_DIR / "observations_*.json"))
-
-        for file_path in observation_files:
-            file = Path(file_path)
-            device_id = file.stem.replace("observations_", "")
-
-            with open(file, 'r') as f:
-                observations = json.load(f)
-
-            if observations:
-                latest = observations[-1]
-                devices.append({
-                    "device_id": device_id,
-                    "observation_count": len(observations),
-                    "latest_gps": {
-                        "latitude": latest.get("gps_latitude"),
-                        "longitude": latest.get("gps_longitude"),
-                        "accuracy": latest.get("gps_accuracy"),
-                        "timestamp": latest.get("timestamp")
-                    }
-                })
+        for device_id, state in device_state.items():
+            latest = state["latest"]
+            devices.append({
+                "device_id": device_id,
+                "observation_count": state["count"],
+                "latest_gps": {
+                    "latitude": latest.get("gps_latitude"),
+                    "longitude": latest.get("gps_longitude"),
+                    "accuracy": latest.get("gps_accuracy"),
+                    "timestamp": latest.get("timestamp")
+                }
+            })
 
         logger.info("devices_listed", count=len(devices))
         return {"devices": devices, "count": len(devices)}
@@ -399,17 +925,7 @@ async def get_all_observations():
     Get observations from all devices (for map visualization).
     """
     try:
-        all_data = {}
-        observation_files = glob.glob(str(OBSERVATIONS_DIR / "observations_*.json"))
-
-        for file_path in observation_files:
-            file = Path(file_path)
-            device_id = file.stem.replace("observations_", "")
-
-            with open(file, 'r') as f:
-                observations = json.load(f)
-
-            all_data[device_id] = observations
+        all_data = await _read_all_observations()
 
         return {"devices": all_data, "device_count": len(all_data)}
 
@@ -422,14 +938,14 @@ async def get_all_observations():
 
 
 @app.exception_handler(Exception)
-async def global_exception_handler(request, exc):
+async def global_exception_handler(request: Request, exc):
     """Global exception handler for unhandled errors."""
     logger.error("unhandled_exception", error=str(exc), path=request.url.path)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "detail": "An unexpected error occurred",
-            "error": str(exc) if get_settings().api_debug else "Internal server error"
+            "error": str(exc) if request.app.state.debug else "Internal server error"
         }
     )
 
@@ -438,10 +954,14 @@ if __name__ == "__main__":
     import uvicorn
 
     settings = get_settings()
+
+    # uvicorn's "auto" loop and HTTP parser already pick uvloop and httptools
+    # when uvicorn[standard] installs them
     uvicorn.run(
         "src.api:app",
         host=settings.api_host,
         port=settings.api_port,
+        workers=1 if settings.api_debug else settings.api_workers,
         reload=settings.api_debug,
-        log_level="info"
+        log_level=settings.log_level
     )
@@ -14,21 +14,35 @@ class Settings(BaseSettings):
     overshoot_api_key: str
     overshoot_api_url: str = "https://cluster1.overshoot.ai/api/v0.2"
     overshoot_timeout: int = 60  # seconds (increased for mobile)
+    overshoot_multipart_upload: bool = False  # send frames as raw multipart parts, not base64 JSON
+    overshoot_gzip_upload: bool = False  # gzip JSON bodies; only if the deployment accepts Content-Encoding
+    adaptive_compression: bool = False  # shrink frames further while Overshoot responds slowly
 
     # API Server Configuration
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     api_debug: bool = False
+    # Device state, log handles and append locks are per process; keep one
+    # worker until that state is process-safe
+    api_workers: int = 1
+    log_level: str = "info"  # events below this level are dropped before processing
 
     # Processing Configuration
     max_image_size_mb: int = 10
     confidence_threshold: float = 0.5
     enable_caching: bool = True
+    similar_frame_cache: bool = False  # reuse results for near-duplicate frames (perceptual hash)
+    max_concurrent_frames: int = 8  # batch frames in flight at the extractor
+    trusted_vision_source: bool = False  # build responses without re-validating them
 
     # Retry configuration
     max_retries: int = 3
     retry_delay: float = 1.0  # seconds
 
+    # Circuit breaker for batch processing
+    circuit_breaker_window: int = 10  # consecutive failed frames that open it
+    circuit_breaker_cooldown: float = 30.0  # seconds before probing again
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
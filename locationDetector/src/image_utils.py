@@ -0,0 +1,68 @@
+"""
+Lightweight image helpers that work on frames as encoded bytes, decoding
+as little of the image as possible.
+"""
+
+from io import BytesIO
+from typing import Optional, Union
+
+from PIL import Image, UnidentifiedImageError
+
+# Start-of-frame markers carrying the image size (SOF0-SOF15, minus DHT/JPG/DAC)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def jpeg_size(data: Union[bytes, bytearray, memoryview]) -> Optional[tuple[int, int]]:
+    """
+    Read (width, height) from a JPEG's start-of-frame header by walking its
+    marker segments, without handing the image to Pillow. Returns None if
+    the data isn't a JPEG or the header can't be found.
+    """
+    if bytes(data[:2]) != b"\xff\xd8":
+        return None
+    pos, end = 2, len(data)
+    while pos + 4 <= end:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # Fill byte before a marker
+            pos += 1
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            if pos + 9 > end:
+                return None
+            height = (data[pos + 5] << 8) | data[pos + 6]
+            width = (data[pos + 7] << 8) | data[pos + 8]
+            return width, height
+        pos += 2 + ((data[pos + 2] << 8) | data[pos + 3])
+    return None
+
+
+# Difference hash grid: DHASH_SIZE + 1 columns give DHASH_SIZE comparisons per row
+DHASH_SIZE = 8
+
+
+def dhash(data: Union[bytes, bytearray, memoryview]) -> Optional[int]:
+    """
+    Compute a 64-bit difference hash of an encoded image: each bit says
+    whether a pixel of an 8x9 grayscale thumbnail is brighter than its right
+    neighbour. Near-identical frames hash within a few bits of each other.
+    Returns None if the data can't be decoded.
+    """
+    try:
+        image = Image.open(BytesIO(data))
+        # JPEGs decode straight at a reduced scale (up to 1/8) for the thumbnail
+        image.draft('L', (DHASH_SIZE * 4, DHASH_SIZE * 4))
+        thumbnail = image.convert('L').resize(
+            (DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.BILINEAR
+        )
+        pixels = thumbnail.tobytes()
+    except (UnidentifiedImageError, OSError):
+        return None
+
+    bits = 0
+    for row in range(DHASH_SIZE):
+        offset = row * (DHASH_SIZE + 1)
+        for col in range(DHASH_SIZE):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
@@ -3,8 +3,10 @@ Metadata extraction service that orchestrates the perception pipeline.
 Handles validation, error recovery, and quality assurance of extracted metadata.
 """
 
-from typing import Optional
+from collections import deque
+from typing import Optional, Union
 import asyncio
+import time
 from pydantic import ValidationError
 import structlog
 
@@ -14,6 +16,43 @@ from src.config import Settings
 
 logger = structlog.get_logger()
 
+# Compiled schema validator, called directly to skip BaseModel.__init__ dispatch
+_metadata_validator = IndoorMetadata.__pydantic_validator__
+
+def _required_fields(model: type) -> frozenset:
+    """Names of a model's fields that have no default."""
+    return frozenset(name for name, field in model.model_fields.items() if field.is_required())
+
+
+# Fields a response, and each detection in it, must carry before it can be
+# built without validation
+_REQUIRED_FIELDS = _required_fields(IndoorMetadata)
+_TEXT_REQUIRED_FIELDS = _required_fields(TextDetection)
+_LANDMARK_REQUIRED_FIELDS = _required_fields(Landmark)
+
+# Constant part of the fallback response. Copies share its empty detection
+# lists, which is safe because nothing appends to a metadata's lists in place
+_FALLBACK_TEMPLATE = IndoorMetadata(
+    scene_type="unknown",
+    scene_confidence=0.1,
+    text_detected=[],
+    landmarks=[],
+    lighting_quality="poor",
+    motion_blur_detected=True,
+    frame_quality_score=0.2,
+    processing_notes=""
+)
+_FALLBACK_TEMPLATE._fallback = True  # Carried over to every copy
+
+
+def _clamp_unit(value: float) -> float:
+    """Clamp a confidence-style score to [0, 1]."""
+    if value < 0.0:
+        return 0.0
+    if value > 1.0:
+        return 1.0
+    return value
+
 
 class MetadataExtractionService:
     """
@@ -27,20 +66,42 @@ class MetadataExtractionService:
         self.overshoot_client = OvershootVisionClient(settings)
         self.confidence_threshold = settings.confidence_threshold
 
+        # Outcomes of the most recent frames (True = failed), for the circuit breaker
+        self._recent_failures: deque[bool] = deque(maxlen=settings.circuit_breaker_window)
+        self._last_failure_at = 0.0
+
+    @property
+    def circuit_open(self) -> bool:
+        """
+        Whether the vision backend looks down: every recent frame failed and
+        the cooldown since the last failure has not elapsed yet.
+        """
+        return (
+            len(self._recent_failures) == self._recent_failures.maxlen
+            and all(self._recent_failures)
+            and time.monotonic() - self._last_failure_at < self.settings.circuit_breaker_cooldown
+        )
+
+    def _record_outcome(self, failed: bool):
+        """Track a frame's outcome for the circuit breaker."""
+        self._recent_failures.append(failed)
+        if failed:
+            self._last_failure_at = time.monotonic()
+
     async def close(self):
         """Clean up resources."""
         await self.overshoot_client.close()
 
     async def process_frame(
         self,
-        image_data: bytes,
+        image_data: Union[bytes, bytearray, memoryview],
         retry_on_failure: bool = True
     ) -> IndoorMetadata:
         """
         Process a single camera frame and extract indoor metadata.
 
         Args:
-            image_data: Raw image bytes from smartphone
+            image_data: Raw image bytes from smartphone (any bytes-like buffer)
             retry_on_failure: Whether to retry on transient failures
 
         Returns:
@@ -50,10 +111,12 @@ class MetadataExtractionService:
             ValueError: If image is invalid or extraction fails
             ValidationError: If extracted data doesn't match schema
         """
+        max_retries = self.settings.max_retries
+        retry_delay = self.settings.retry_delay
         attempt = 0
         last_error = None
 
-        while attempt < self.settings.max_retries:
+        while attempt < max_retries:
             try:
                 # Extract metadata using Overshoot API
                 raw_metadata = await self.overshoot_client.extract_metadata(
@@ -76,9 +139,12 @@ class MetadataExtractionService:
                     frame_quality=metadata.frame_quality_score
                 )
 
+                self._record_outcome(failed=False)
                 return metadata
 
             except ValidationError as e:
+                # The backend answered, so this does not count towards the breaker
+                self._record_outcome(failed=False)
                 logger.error("validation_error", error=str(e), raw_data=raw_metadata)
                 # Try to create a fallback response
                 return self._create_fallback_metadata(
@@ -90,20 +156,22 @@ class MetadataExtractionService:
                 last_error = e
                 attempt += 1
 
-                if attempt < self.settings.max_retries and retry_on_failure:
+                if attempt < max_retries and retry_on_failure:
                     logger.warning(
                         "extraction_failed_retrying",
                         attempt=attempt,
-                        max_retries=self.settings.max_retries,
+                        max_retries=max_retries,
                         error=str(e)
                     )
-                    await asyncio.sleep(self.settings.retry_delay * attempt)
+                    await asyncio.sleep(retry_delay * attempt)
                 else:
                     logger.error("extraction_failed", error=str(e))
+                    self._record_outcome(failed=True)
                     raise
 
         # If all retries failed
-        raise ValueError(f"Failed to extract metadata after {self.settings.max_retries} attempts: {last_error}")
+        self._record_outcome(failed=True)
+        raise ValueError(f"Failed to extract metadata after {max_retries} attempts: {last_error}")
 
     def _validate_and_parse(self, raw_metadata: dict) -> IndoorMetadata:
         """
@@ -118,73 +186,102 @@ class MetadataExtractionService:
         Raises:
             ValidationError: If data doesn't match schema
         """
+        if self.settings.trusted_vision_source:
+            metadata = self._construct_trusted(raw_metadata)
+            if metadata is not None:
+                return metadata
+
         try:
             # Pydantic will validate all fields and constraints
-            metadata = IndoorMetadata(**raw_metadata)
-            return metadata
+            return _metadata_validator.validate_python(raw_metadata)
 
         except ValidationError as e:
             logger.warning("validation_error_attempting_recovery", error=str(e))
 
             # Attempt to fix common issues
-            fixed_metadata = self._attempt_fix_validation_errors(raw_metadata)
+            fixed_metadata = self._attempt_fix_validation_errors(raw_metadata, e.errors())
 
             # Try again with fixed data
-            return IndoorMetadata(**fixed_metadata)
+            return _metadata_validator.validate_python(fixed_metadata)
+
+    def _construct_trusted(self, raw_metadata: dict) -> Optional[IndoorMetadata]:
+        """
+        Build IndoorMetadata from a trusted backend's response without
+        validating it. Field values are taken as-is, so this is only enabled
+        through the trusted_vision_source setting.
+
+        Args:
+            raw_metadata: Dictionary from Overshoot API
 
-    def _attempt_fix_validation_errors(self, raw_data: dict) -> dict:
+        Returns:
+            Unvalidated IndoorMetadata instance, or None if the response or
+            any detection in it is missing a required field, so the
+            validating path can repair it instead
+        """
+        if not _REQUIRED_FIELDS <= raw_metadata.keys():
+            return None
+
+        texts = raw_metadata.get("text_detected", ())
+        landmarks = raw_metadata.get("landmarks", ())
+        if not isinstance(texts, list) or not isinstance(landmarks, list):
+            return None
+        for items, required in ((texts, _TEXT_REQUIRED_FIELDS), (landmarks, _LANDMARK_REQUIRED_FIELDS)):
+            for item in items:
+                if not isinstance(item, dict) or not required <= item.keys():
+                    return None
+
+        fields = dict(raw_metadata)
+        fields["text_detected"] = [TextDetection.model_construct(**text) for text in texts]
+        fields["landmarks"] = [Landmark.model_construct(**landmark) for landmark in landmarks]
+        return IndoorMetadata.model_construct(**fields)
+
+    def _attempt_fix_validation_errors(self, raw_data: dict, errors: list[dict]) -> dict:
         """
         Attempt to fix common validation errors in raw data.
 
+        Only the top-level fields named in the validation errors are repaired,
+        and the dictionary is modified in place: it was decoded from this
+        frame's API response and nothing else holds on to it.
+
         Args:
             raw_data: Raw metadata dictionary
+            errors: Errors from the failed validation (ValidationError.errors())
 
         Returns:
-            Fixed metadata dictionary
+            The same dictionary, fixed
         """
-        fixed = raw_data.copy()
+        failed = {error["loc"][0] for error in errors if error["loc"]}
 
         # Ensure required fields exist
-        if "scene_type" not in fixed:
-            fixed["scene_type"] = "unknown"
-            fixed["scene_confidence"] = 0.3
-
-        if "scene_confidence" not in fixed:
-            fixed["scene_confidence"] = 0.5
+        if "scene_type" in failed and "scene_type" not in raw_data:
+            raw_data["scene_type"] = "unknown"
+            raw_data["scene_confidence"] = 0.3
 
-        if "frame_quality_score" not in fixed:
-            fixed["frame_quality_score"] = 0.5
+        if "scene_confidence" in failed:
+            raw_data["scene_confidence"] = _clamp_unit(raw_data.get("scene_confidence", 0.5))
 
-        # Clamp confidence values to [0, 1]
-        if "scene_confidence" in fixed:
-            fixed["scene_confidence"] = max(0.0, min(1.0, fixed["scene_confidence"]))
-
-        if "frame_quality_score" in fixed:
-            fixed["frame_quality_score"] = max(0.0, min(1.0, fixed["frame_quality_score"]))
+        if "frame_quality_score" in failed:
+            raw_data["frame_quality_score"] = _clamp_unit(raw_data.get("frame_quality_score", 0.5))
 
         # Fix text detections
-        if "text_detected" in fixed:
+        if "text_detected" in failed:
             fixed_texts = []
-            for text_item in fixed["text_detected"]:
+            for text_item in raw_data["text_detected"]:
                 if isinstance(text_item, dict) and "text" in text_item:
-                    if "confidence" not in text_item:
-                        text_item["confidence"] = 0.5
-                    text_item["confidence"] = max(0.0, min(1.0, text_item["confidence"]))
+                    text_item["confidence"] = _clamp_unit(text_item.get("confidence", 0.5))
                     fixed_texts.append(text_item)
-            fixed["text_detected"] = fixed_texts
+            raw_data["text_detected"] = fixed_texts
 
         # Fix landmarks
-        if "landmarks" in fixed:
+        if "landmarks" in failed:
             fixed_landmarks = []
-            for landmark in fixed["landmarks"]:
+            for landmark in raw_data["landmarks"]:
                 if isinstance(landmark, dict) and all(k in landmark for k in ["type", "direction", "distance"]):
-                    if "confidence" not in landmark:
-                        landmark["confidence"] = 0.5
-                    landmark["confidence"] = max(0.0, min(1.0, landmark["confidence"]))
+                    landmark["confidence"] = _clamp_unit(landmark.get("confidence", 0.5))
                     fixed_landmarks.append(landmark)
-            fixed["landmarks"] = fixed_landmarks
+            raw_data["landmarks"] = fixed_landmarks
 
-        return fixed
+        return raw_data
 
     def _apply_confidence_filtering(self, metadata: IndoorMetadata) -> IndoorMetadata:
         """
@@ -194,31 +291,31 @@ class MetadataExtractionService:
             metadata: Original metadata
 
         Returns:
-            Filtered metadata with only high-confidence detections
+            The same metadata with low-confidence detections removed
         """
+        threshold = self.confidence_threshold
+
         # Filter text detections
         filtered_texts = [
             text for text in metadata.text_detected
-            if text.confidence >= self.confidence_threshold
+            if text.confidence >= threshold
         ]
 
         # Filter landmarks
         filtered_landmarks = [
             landmark for landmark in metadata.landmarks
-            if landmark.confidence >= self.confidence_threshold
+            if landmark.confidence >= threshold
         ]
 
-        # Create new metadata with filtered data
-        filtered = metadata.model_copy()
-        filtered.text_detected = filtered_texts
-        filtered.landmarks = filtered_landmarks
-
+        # The metadata was freshly parsed for this frame, so update it in
+        # place rather than copying the whole model
         if len(filtered_texts) < len(metadata.text_detected):
             logger.debug(
                 "filtered_low_confidence_texts",
                 original=len(metadata.text_detected),
                 filtered=len(filtered_texts)
             )
+            metadata.text_detected = filtered_texts
 
         if len(filtered_landmarks) < len(metadata.landmarks):
             logger.debug(
@@ -226,8 +323,9 @@ class MetadataExtractionService:
                 original=len(metadata.landmarks),
                 filtered=len(filtered_landmarks)
             )
+            metadata.landmarks = filtered_landmarks
 
-        return filtered
+        return metadata
 
     def _create_fallback_metadata(
         self,
@@ -246,50 +344,34 @@ class MetadataExtractionService:
         """
         logger.warning("creating_fallback_metadata", error=error_msg)
 
-        return IndoorMetadata(
-            scene_type="unknown",
-            scene_confidence=0.1,
-            text_detected=[],
-            landmarks=[],
-            lighting_quality="poor",
-            motion_blur_detected=True,
-            frame_quality_score=0.2,
-            processing_notes=f"Extraction failed: {error_msg}"
+        return _FALLBACK_TEMPLATE.model_copy(
+            update={"processing_notes": f"Extraction failed: {error_msg}"}
         )
 
-    async def process_frame_batch(
+    @staticmethod
+    def is_fallback(metadata: IndoorMetadata) -> bool:
+        """Whether metadata is a fallback standing in for a failed extraction."""
+        return metadata._fallback
+
+    async def process_frame_or_fallback(
         self,
-        frames: list[bytes],
-        max_concurrent: int = 5
-    ) -> list[IndoorMetadata]:
+        image_data: Union[bytes, bytearray, memoryview]
+    ) -> IndoorMetadata:
         """
-        Process multiple frames concurrently.
+        Process a frame, answering with fallback metadata instead of raising,
+        so one failed frame doesn't fail the rest of a batch.
 
         Args:
-            frames: List of image byte arrays
-            max_concurrent: Maximum concurrent API requests
+            image_data: Raw image bytes from smartphone (any bytes-like buffer)
 
         Returns:
-            List of extracted metadata for each frame
+            Extracted metadata, or fallback metadata if extraction failed
         """
-        semaphore = asyncio.Semaphore(max_concurrent)
-
-        async def process_with_semaphore(frame_data: bytes) -> IndoorMetadata:
-            async with semaphore:
-                return await self.process_frame(frame_data)
-
-        tasks = [process_with_semaphore(frame) for frame in frames]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Convert exceptions to fallback metadata
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error("batch_frame_processing_failed", frame_index=i, error=str(result))
-                processed_results.append(
-                    self._create_fallback_metadata(f"Batch processing error: {result}")
-                )
-            else:
-                processed_results.append(result)
-
-        return processed_results
+        if self.circuit_open:
+            # Backend is down; don't spend retries on the rest of the batch
+            return self._create_fallback_metadata("Vision backend unavailable")
+        try:
+            return await self.process_frame(image_data)
+        except Exception as e:
+            logger.error("batch_frame_processing_failed", error=str(e))
+            return self._create_fallback_metadata(f"Batch processing error: {e}")
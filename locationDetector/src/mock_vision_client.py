@@ -4,12 +4,62 @@ Returns realistic-looking fake metadata for testing the UI.
 """
 
 import random
+from typing import Union
 import structlog
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 from io import BytesIO
 
+from src.image_utils import jpeg_size
+
 logger = structlog.get_logger()
 
+# Fixed choice pools, built once instead of on every mock frame
+SCENE_TYPES = ("hallway", "room", "lobby", "stairwell", "elevator_area", "corridor_intersection")
+LIGHTING_OPTIONS = ("good", "dim", "poor", "backlit")
+LIGHTING_CUM_WEIGHTS = (0.6, 0.8, 0.9, 1.0)  # Bias toward "good" (0.6/0.2/0.1/0.1)
+
+# Frame quality penalties
+LIGHTING_PENALTIES = {"good": 0.0, "dim": 0.10, "poor": 0.20, "backlit": 0.20}
+SMALL_FRAME_PENALTY = 0.15
+MOTION_BLUR_PENALTY = 0.15
+
+# Text templates: (text, number range filled into "{}" or None, confidence range)
+TEXT_TEMPLATES = (
+    ("Room {}", (100, 999), (0.75, 0.95)),
+    ("Floor {}", (1, 10), (0.80, 0.98)),
+    ("EXIT", None, (0.85, 0.99)),
+    ("Suite {}", (200, 500), (0.70, 0.90)),
+    ("STAIRS →", None, (0.65, 0.88)),
+)
+
+# Landmark templates: (type, direction choices, distance choices, confidence range)
+LANDMARK_TEMPLATES = (
+    ("door", ("left", "right", "ahead"), ("near", "mid", "far"), (0.75, 0.95)),
+    ("exit_sign", ("ahead",), ("mid",), (0.80, 0.98)),
+    ("staircase", ("left", "right"), ("near", "mid"), (0.70, 0.92)),
+    ("elevator", ("left", "right", "ahead"), ("mid",), (0.75, 0.95)),
+    ("fire_extinguisher", ("left", "right"), ("near",), (0.65, 0.90)),
+)
+
+
+def _mock_text(template: tuple) -> dict:
+    """Build one mock text detection from a TEXT_TEMPLATES entry."""
+    text, number_range, (low, high) = template
+    if number_range is not None:
+        text = text.format(random.randint(*number_range))
+    return {"text": text, "confidence": random.uniform(low, high)}
+
+
+def _mock_landmark(template: tuple) -> dict:
+    """Build one mock landmark from a LANDMARK_TEMPLATES entry."""
+    landmark_type, directions, distances, (low, high) = template
+    return {
+        "type": landmark_type,
+        "direction": random.choice(directions),
+        "distance": random.choice(distances),
+        "confidence": random.uniform(low, high)
+    }
+
 
 class MockVisionClient:
     """Mock client that returns fake but realistic metadata."""
@@ -22,89 +72,50 @@ class MockVisionClient:
         """No cleanup needed for mock."""
         pass
 
-    async def extract_metadata(self, image_data: bytes, compress: bool = True) -> dict:
+    async def extract_metadata(self, image_data: Union[bytes, bytearray, memoryview], compress: bool = True) -> dict:
         """Return mock metadata based on randomization."""
 
-        # Analyze image to determine quality
-        try:
-            image = Image.open(BytesIO(image_data))
-            width, height = image.size
-            is_small = width < 400 or height < 400
-            is_large = width > 1920 or height > 1920
-        except:
-            width, height = 640, 480
-            is_small, is_large = False, False
+        # Analyze image to determine quality; JPEG sizes come straight from
+        # the header, anything else goes through Pillow
+        size = jpeg_size(image_data)
+        if size is None:
+            try:
+                size = Image.open(BytesIO(image_data)).size
+            except (UnidentifiedImageError, OSError):
+                size = (640, 480)
+        width, height = size
+        is_small = width < 400 or height < 400
+        is_large = width > 1920 or height > 1920
 
         # Randomly select scene type
-        scene_types = ["hallway", "room", "lobby", "stairwell", "elevator_area", "corridor_intersection"]
-        scene_type = random.choice(scene_types)
-
-        # Generate mock text detections
-        text_options = [
-            {"text": f"Room {random.randint(100, 999)}", "confidence": random.uniform(0.75, 0.95)},
-            {"text": f"Floor {random.randint(1, 10)}", "confidence": random.uniform(0.80, 0.98)},
-            {"text": "EXIT", "confidence": random.uniform(0.85, 0.99)},
-            {"text": f"Suite {random.randint(200, 500)}", "confidence": random.uniform(0.70, 0.90)},
-            {"text": "STAIRS →", "confidence": random.uniform(0.65, 0.88)},
-        ]
+        scene_type = random.choice(SCENE_TYPES)
 
+        # Generate mock text detections; only the sampled templates are built
         num_texts = random.randint(0, 3)
-        selected_texts = random.sample(text_options, min(num_texts, len(text_options)))
-
-        # Generate mock landmarks
-        landmark_options = [
-            {
-                "type": "door",
-                "direction": random.choice(["left", "right", "ahead"]),
-                "distance": random.choice(["near", "mid", "far"]),
-                "confidence": random.uniform(0.75, 0.95)
-            },
-            {
-                "type": "exit_sign",
-                "direction": "ahead",
-                "distance": "mid",
-                "confidence": random.uniform(0.80, 0.98)
-            },
-            {
-                "type": "staircase",
-                "direction": random.choice(["left", "right"]),
-                "distance": random.choice(["near", "mid"]),
-                "confidence": random.uniform(0.70, 0.92)
-            },
-            {
-                "type": "elevator",
-                "direction": random.choice(["left", "right", "ahead"]),
-                "distance": "mid",
-                "confidence": random.uniform(0.75, 0.95)
-            },
-            {
-                "type": "fire_extinguisher",
-                "direction": random.choice(["left", "right"]),
-                "distance": "near",
-                "confidence": random.uniform(0.65, 0.90)
-            }
+        selected_texts = [
+            _mock_text(template)
+            for template in random.sample(TEXT_TEMPLATES, min(num_texts, len(TEXT_TEMPLATES)))
         ]
 
+        # Generate mock landmarks
         num_landmarks = random.randint(1, 4)
-        selected_landmarks = random.sample(landmark_options, min(num_landmarks, len(landmark_options)))
+        selected_landmarks = [
+            _mock_landmark(template)
+            for template in random.sample(LANDMARK_TEMPLATES, min(num_landmarks, len(LANDMARK_TEMPLATES)))
+        ]
 
         # Determine quality factors
-        lighting_options = ["good", "dim", "poor", "backlit"]
-        lighting_weights = [0.6, 0.2, 0.1, 0.1]  # Bias toward "good"
-        lighting = random.choices(lighting_options, weights=lighting_weights)[0]
+        lighting = random.choices(LIGHTING_OPTIONS, cum_weights=LIGHTING_CUM_WEIGHTS)[0]
 
         motion_blur = random.random() < 0.2  # 20% chance of blur
 
         # Calculate frame quality
-        base_quality = 0.85
-        if is_small:
-            base_quality -= 0.15
-        if lighting in ["poor", "backlit"]:
-            base_quality -= 0.20
-        if lighting == "dim":
-            base_quality -= 0.10
-        if motion_blur:
-            base_quality -= 0.15
+        base_quality = (
+            0.85
+            - LIGHTING_PENALTIES[lighting]
+            - SMALL_FRAME_PENALTY * is_small
+            - MOTION_BLUR_PENALTY * motion_blur
+        )
 
         frame_quality = max(0.2, min(0.99, base_quality + random.uniform(-0.05, 0.05)))
 
@@ -124,6 +135,6 @@ class MockVisionClient:
 
         return metadata
 
-    async def _compress_image(self, image_data: bytes, max_dimension: int = 1024, quality: int = 85) -> bytes:
+    async def _compress_image(self, image_data: Union[bytes, bytearray, memoryview], max_dimension: int = 1024, quality: int = 85) -> bytes:
         """Mock compression - just return the data."""
         return image_data
@@ -4,7 +4,7 @@ Defines the strict JSON schema for observations extracted from phone camera fram
 """
 
 from typing import Literal, Optional
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 
 
 class TextDetection(BaseModel):
@@ -115,6 +115,9 @@ class IndoorMetadata(BaseModel):
         description="Optional notes about processing issues or ambiguities"
     )
 
+    # Set on fallbacks standing in for a failed extraction; never serialized
+    _fallback: bool = PrivateAttr(default=False)
+
     class Config:
         json_schema_extra = {
             "example": {
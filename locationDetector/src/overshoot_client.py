@@ -3,18 +3,66 @@ Overshoot Vision API client for indoor environment perception.
 Handles API communication and prompt engineering for metadata extraction.
 """
 
-import base64
-import json
-from typing import Optional
+import asyncio
+import gzip
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+from cachetools import TTLCache
 import httpx
+import orjson
 from io import BytesIO
 from PIL import Image
 import structlog
 
+try:
+    # SIMD (SSSE3/AVX2) base64 with the stdlib API; frames are the bulk of each request
+    import pybase64 as base64
+except ImportError:  # Pure speedup; the stdlib module is equivalent
+    import base64
+
 from src.config import Settings
+from src.image_utils import dhash, jpeg_size
 
 logger = structlog.get_logger()
 
+# JPEGs within max_dimension and this size are sent without recompression
+PASSTHROUGH_MAX_BYTES = 512 * 1024
+
+# Adaptive compression tiers: (latency EWMA upper bound in seconds,
+# max_dimension, JPEG quality). Latency is the whole request, model
+# inference included, so the bounds sit well above network RTTs
+COMPRESSION_TIERS = (
+    (2.0, 1024, 85),
+    (5.0, 768, 70),
+    (float("inf"), 512, 55)
+)
+LATENCY_EWMA_ALPHA = 0.2
+
+# Recent results keyed by frame dHash; a frame within SIMILAR_FRAME_MAX_DISTANCE
+# bits of a cached hash is treated as the same view and skips the API call
+SIMILAR_FRAME_CACHE_SIZE = 128
+SIMILAR_FRAME_CACHE_TTL = 30  # seconds
+SIMILAR_FRAME_MAX_DISTANCE = 5
+
+# Connecting and waiting for a pooled connection get short timeouts of their
+# own; overshoot_timeout covers reading and writing, where inference time goes
+CONNECT_TIMEOUT = 5.0  # seconds
+POOL_TIMEOUT = 5.0  # seconds
+
+# Base64 text packs 6 bits per byte, so gzip wins back most of its overhead;
+# bodies below the minimum aren't worth the extra header and CPU
+GZIP_MIN_BYTES = 4096
+GZIP_LEVEL = 3
+
+# Statuses meaning an endpoint exists but won't take a multipart frame upload
+MULTIPART_REJECTED_STATUSES = frozenset({400, 415, 422})
+
+
+class _InflightAbandoned(Exception):
+    """Raised to followers of a shared request whose leader was cancelled."""
+
 
 class OvershootVisionClient:
     """Client for interacting with Overshoot Vision API."""
@@ -158,28 +206,94 @@ REMEMBER: You are a SENSOR for NAVIGATION. Extract only navigation-critical obse
         
         logger.info("overshoot_client_initialized", api_url=self.api_url, has_api_key=bool(self.api_key))
 
+        # Constant part of every request; only the frame is added per call
+        self._payload_template = {
+            "prompt": self.EXTRACTION_PROMPT,
+            "clip_length_seconds": 1.0,
+            "delay_seconds": 1.0,
+            "fps": 1,
+            "sampling_ratio": 1.0
+        }
+
+        # The JSON body around the frame's base64 data, encoded once. base64
+        # output never needs JSON escaping, so each request only splices the
+        # encoded frame between these instead of re-serializing the prompt
+        self._json_body_prefix = orjson.dumps(self._payload_template)[:-1] + b',"frames":[{"data":"'
+        self._json_body_suffix = b'","timestamp":0.0}]}'
+
+        # Try different endpoint paths - Overshoot SDK uses streams internally.
+        # Multiple endpoints since Overshoot is designed for video streams, not
+        # single images: /streams first, then the base URL as fallback
+        self._base_url = self.api_url.rstrip('/')
+        self._endpoints = (
+            f"{self._base_url}/streams",
+            f"{self._base_url}/analyze",
+            f"{self._base_url}/frames",
+            self._base_url
+        )
+
+        # First endpoint that accepted a frame; tried first from then on
+        self._resolved_endpoint: Optional[str] = None
+        # Set while a cold-start probe runs, so concurrent cold frames wait
+        # for its answer instead of each sending the frame to every endpoint
+        self._endpoint_probe: Optional[asyncio.Future] = None
+
+        # Requests in flight, by frame content digest, resolving to the encoded result
+        self._inflight: dict[bytes, asyncio.Future] = {}
+
+        # Encoded results of recent frames, by perceptual hash
+        self._similar_frames: TTLCache = TTLCache(
+            maxsize=SIMILAR_FRAME_CACHE_SIZE, ttl=SIMILAR_FRAME_CACHE_TTL
+        )
+
+        # Smoothed request latency, driving the adaptive compression tier
+        self._latency_ewma: Optional[float] = None
+
+        # Multipart form fields carry the same settings; switched off for the
+        # rest of the client's lifetime once the API rejects a multipart upload
+        self._multipart_upload = settings.overshoot_multipart_upload
+        self._multipart_fields = {key: str(value) for key, value in self._payload_template.items()}
+
+        # Image compression runs on its own pool so CPU-heavy frames don't
+        # queue behind (or starve) file I/O on the loop's default executor
+        self._compress_pool = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            thread_name_prefix="compress"
+        )
+
+        # HTTP/2 multiplexes concurrent frame uploads over one TLS connection;
+        # the pool keeps connections warm between frames of a stream
         self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(self.timeout),
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
+            timeout=httpx.Timeout(
+                self.timeout,
+                connect=CONNECT_TIMEOUT,
+                pool=POOL_TIMEOUT
+            ),
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=64,
+                max_keepalive_connections=32,
+                keepalive_expiry=60
+            ),
+            # Content-Type is set per request, since it depends on the upload mode
+            headers={"Authorization": f"Bearer {self.api_key}"}
         )
 
     async def close(self):
-        """Close the HTTP client."""
+        """Close the HTTP client and the compression pool."""
         await self.client.aclose()
+        self._compress_pool.shutdown(wait=False)
 
     async def extract_metadata(
         self,
-        image_data: bytes,
+        image_data: Union[bytes, bytearray, memoryview],
         compress: bool = True
     ) -> dict:
         """
         Extract indoor metadata from a phone camera image.
 
         Args:
-            image_data: Raw image bytes from smartphone camera
+            image_data: Raw image bytes from smartphone camera (any bytes-like buffer)
             compress: Whether to compress image before sending (recommended for mobile)
 
         Returns:
@@ -192,60 +306,137 @@ REMEMBER: You are a SENSOR for NAVIGATION. Extract only navigation-critical obse
         try:
             # Optionally compress image to reduce mobile data usage
             if compress:
-                image_data = await self._compress_image(image_data)
-
-            # Encode image as base64
-            image_b64 = base64.b64encode(image_data).decode('utf-8')
-
-            # Construct API request for Overshoot
-            # Overshoot API expects video streams with frames array
-            # Send single frame as a 1-frame "clip" to simulate video window
-            payload = {
-                "prompt": self.EXTRACTION_PROMPT,
-                "frames": [
-                    {
-                        "data": image_b64,
-                        "timestamp": 0.0
-                    }
-                ],
-                "clip_length_seconds": 1.0,
-                "delay_seconds": 1.0,
-                "fps": 1,
-                "sampling_ratio": 1.0
-            }
+                if self.settings.adaptive_compression:
+                    max_dimension, quality = self._compression_tier()
+                    image_data = await self._compress_image(image_data, max_dimension, quality)
+                else:
+                    image_data = await self._compress_image(image_data)
+
+            frame_hash = None
+            if self.settings.similar_frame_cache:
+                loop = asyncio.get_running_loop()
+                frame_hash = await loop.run_in_executor(self._compress_pool, dhash, image_data)
+                cached = self._find_similar_frame(frame_hash)
+                if cached is not None:
+                    logger.info("similar_frame_cache_hit")
+                    return cached
+
+            # Identical frames already in flight (e.g. a client retry burst)
+            # share one request instead of each calling the API
+            inflight_key = hashlib.blake2b(image_data, digest_size=16).digest()
+            pending = self._inflight.get(inflight_key)
+            while pending is not None:
+                logger.info("inflight_request_joined")
+                try:
+                    # Shielded so a cancelled follower doesn't cancel the shared request
+                    return orjson.loads(await asyncio.shield(pending))
+                except _InflightAbandoned:
+                    # The leader was cancelled; join or become the next one
+                    pending = self._inflight.get(inflight_key)
+
+            inflight = asyncio.get_running_loop().create_future()
+            self._inflight[inflight_key] = inflight
+            try:
+                metadata_json = await self._request_metadata(image_data)
+            except asyncio.CancelledError:
+                # Followers weren't cancelled themselves, so they retry rather
+                # than inherit the cancellation
+                inflight.set_exception(_InflightAbandoned())
+                inflight.exception()
+                raise
+            except Exception as e:
+                inflight.set_exception(e)
+                inflight.exception()  # Retrieved here; followers may not exist
+                raise
+            finally:
+                del self._inflight[inflight_key]
+
+            # Followers and the similar-frame cache get their own copies, since
+            # callers repair and filter the returned dict in place
+            encoded = orjson.dumps(metadata_json)
+            inflight.set_result(encoded)
+            if frame_hash is not None:
+                self._similar_frames[frame_hash] = encoded
 
-            # Try different endpoint paths - Overshoot SDK uses streams internally
-            # Try multiple endpoints since Overshoot is designed for video streams, not single images
-            base_url = self.api_url.rstrip('/')
-            
-            logger.info("sending_request_to_overshoot", image_size_kb=len(image_data) / 1024, base_url=base_url)
+            return metadata_json
 
-            # Make API request - try /streams first, then base URL as fallback
-            response = None
+        except httpx.HTTPError as e:
+            logger.error("overshoot_api_error", error=str(e))
+            raise
+        except orjson.JSONDecodeError as e:
+            logger.error("invalid_json_response", error=str(e))
+            raise ValueError(f"Overshoot returned invalid JSON: {e}")
+        except Exception as e:
+            logger.error("unexpected_error", error=str(e))
+            raise
+
+    async def _request_metadata(self, image_data: Union[bytes, bytearray, memoryview]) -> dict:
+        """
+        Send a prepared frame to Overshoot and parse the metadata from the response.
+
+        Args:
+            image_data: Image bytes, already compressed if requested
+
+        Returns:
+            Dictionary containing the extracted metadata
+        """
+        # Built once and reused across endpoint attempts
+        if self._multipart_upload:
+            request = self._multipart_request(image_data)
+        else:
+            request = self._json_request(image_data)
+
+        # Make API request, starting with the endpoint that worked last time
+        # so a deployment without /streams doesn't re-probe on every frame
+        resolved = self._resolved_endpoint
+        while resolved is None and self._endpoint_probe is not None:
+            # Another frame is finding the endpoint; post once it's known, or
+            # take over if that frame failed
+            await asyncio.shield(self._endpoint_probe)
+            resolved = self._resolved_endpoint
+
+        probe = None
+        if resolved is None:
+            # Cold start: this frame finds the endpoint while later ones wait
+            probe = self._endpoint_probe = asyncio.get_running_loop().create_future()
+        try:
+            if probe is not None:
+                resolved = await self._probe_endpoints()
+
+            endpoint = None
             last_error = None
-            
-            # Try /streams endpoint first
-            endpoints_to_try = [
-                f"{base_url}/streams",
-                f"{base_url}/analyze", 
-                f"{base_url}/frames",
-                base_url
-            ]
-            
+            attempts = 0
+
+            if resolved is None:
+                endpoints_to_try = self._endpoints
+            else:
+                endpoints_to_try = (resolved,) + tuple(
+                    endpoint for endpoint in self._endpoints if endpoint != resolved
+                )
+
             for try_endpoint in endpoints_to_try:
+                attempts += 1
                 try:
-                    logger.debug("trying_endpoint", endpoint=try_endpoint)
-                    response = await self.client.post(
-                        try_endpoint,
-                        json=payload
-                    )
+                    response = await self.client.post(try_endpoint, **request)
+                    if self._multipart_upload and response.status_code in MULTIPART_REJECTED_STATUSES:
+                        logger.warning(
+                            "multipart_upload_rejected",
+                            endpoint=try_endpoint,
+                            status=response.status_code
+                        )
+                        self._multipart_upload = False
+                        request = self._json_request(image_data)
+                        response = await self.client.post(try_endpoint, **request)
                     response.raise_for_status()
-                    logger.info("overshoot_request_success", endpoint=try_endpoint, status=response.status_code)
+                    if self.settings.adaptive_compression:
+                        self._record_latency(response.elapsed.total_seconds())
+                    self._resolved_endpoint = endpoint = try_endpoint
                     break
                 except httpx.HTTPStatusError as e:
                     last_error = e
                     if e.response.status_code == 404:
-                        logger.debug("endpoint_not_found", endpoint=try_endpoint, status=404)
+                        if try_endpoint == self._resolved_endpoint:
+                            self._resolved_endpoint = None
                         continue  # Try next endpoint
                     else:
                         # Non-404 error, re-raise
@@ -256,69 +447,204 @@ REMEMBER: You are a SENSOR for NAVIGATION. Extract only navigation-critical obse
                     if try_endpoint == endpoints_to_try[-1]:
                         # Last endpoint failed, raise
                         raise
-            
-            if response is None:
+
+            if endpoint is None:
                 raise httpx.HTTPError(f"All endpoints failed. Last error: {last_error}")
+        finally:
+            if probe is not None:
+                self._endpoint_probe = None
+                probe.set_result(None)
+
+        # One line per frame rather than per endpoint attempt
+        logger.info(
+            "overshoot_request",
+            endpoint=endpoint,
+            attempts=attempts,
+            image_size_kb=len(image_data) / 1024
+        )
 
-            # Parse response
-            result = response.json()
+        # Parse response; orjson decodes the raw body in one C pass
+        result = orjson.loads(response.content)
 
-            # Extract the actual metadata from the response
-            # Adjust this based on Overshoot API response structure
-            if "content" in result:
-                metadata_json = result["content"]
-            elif "response" in result:
-                metadata_json = result["response"]
-            else:
-                metadata_json = result
+        # Extract the actual metadata from the response
+        # Adjust this based on Overshoot API response structure
+        if "content" in result:
+            metadata_json = result["content"]
+        elif "response" in result:
+            metadata_json = result["response"]
+        else:
+            metadata_json = result
 
-            # Handle case where response might be a string
-            if isinstance(metadata_json, str):
-                metadata_json = json.loads(metadata_json)
+        # Handle case where response might be a string
+        if isinstance(metadata_json, str):
+            metadata_json = orjson.loads(metadata_json)
 
-            logger.info("metadata_extracted_successfully", scene_type=metadata_json.get("scene_type"))
+        logger.info("metadata_extracted_successfully", scene_type=metadata_json.get("scene_type"))
 
-            return metadata_json
+        return metadata_json
 
-        except httpx.HTTPError as e:
-            logger.error("overshoot_api_error", error=str(e))
-            raise
-        except json.JSONDecodeError as e:
-            logger.error("invalid_json_response", error=str(e))
-            raise ValueError(f"Overshoot returned invalid JSON: {e}")
-        except Exception as e:
-            logger.error("unexpected_error", error=str(e))
-            raise
+    async def _probe_endpoints(self) -> Optional[str]:
+        """
+        Find the first endpoint, in preference order, that exists, without
+        sending a frame: every endpoint gets an empty-bodied POST at once,
+        which a live route rejects (e.g. 400/422) before any inference and a
+        missing one answers with 404. A cold start then uploads its frame
+        once and waits out the slowest 404 probe ahead of the winner rather
+        than the sum of them.
+
+        Returns:
+            The first endpoint that didn't answer 404, or None if none did
+        """
+        tasks = [
+            asyncio.create_task(self.client.post(endpoint, content=b""))
+            for endpoint in self._endpoints
+        ]
+        try:
+            for endpoint, task in zip(self._endpoints, tasks):
+                try:
+                    response = await task
+                except httpx.HTTPError as e:
+                    logger.debug("endpoint_probe_failed", endpoint=endpoint, error=str(e))
+                    continue
+                if response.status_code != 404:
+                    return endpoint
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # Mark failures behind the winner as retrieved
+        return None
+
+    def _find_similar_frame(self, frame_hash: Optional[int]) -> Optional[dict]:
+        """
+        Look up a cached result for a frame whose hash is within
+        SIMILAR_FRAME_MAX_DISTANCE bits. Results are cached encoded, so every
+        hit hands the caller its own dict to repair or filter.
+        """
+        if frame_hash is None:
+            return None
+        for cached_hash, encoded in self._similar_frames.items():
+            if bin(frame_hash ^ cached_hash).count("1") <= SIMILAR_FRAME_MAX_DISTANCE:
+                return orjson.loads(encoded)
+        return None
+
+    def _record_latency(self, seconds: float):
+        """Fold a successful request's latency into the moving average."""
+        if self._latency_ewma is None:
+            self._latency_ewma = seconds
+        else:
+            self._latency_ewma += LATENCY_EWMA_ALPHA * (seconds - self._latency_ewma)
+
+    def _compression_tier(self) -> tuple[int, int]:
+        """Pick (max_dimension, quality) for the next frame from recent latency."""
+        if self._latency_ewma is None:
+            return COMPRESSION_TIERS[0][1:]
+        for max_latency, max_dimension, quality in COMPRESSION_TIERS:
+            if self._latency_ewma < max_latency:
+                return max_dimension, quality
+        return COMPRESSION_TIERS[-1][1:]
+
+    def _json_request(self, image_data: Union[bytes, bytearray, memoryview]) -> dict:
+        """
+        Build request arguments carrying the frame base64-encoded in a JSON body.
+
+        Overshoot expects video streams with a frames array, so the single
+        frame is sent as a 1-frame "clip" to simulate a video window.
+        """
+        body = b"".join((
+            self._json_body_prefix,
+            base64.b64encode(image_data),
+            self._json_body_suffix
+        ))
+        if self.settings.overshoot_gzip_upload and len(body) >= GZIP_MIN_BYTES:
+            return {
+                "content": gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0),
+                "headers": {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+            }
+        return {
+            "content": body,
+            "headers": {"Content-Type": "application/json"}
+        }
+
+    def _multipart_request(self, image_data: Union[bytes, bytearray, memoryview]) -> dict:
+        """
+        Build request arguments carrying the frame as a raw JPEG part, which
+        skips base64 encoding and its 33% size overhead.
+        """
+        # httpx only sends bytes directly; other buffers would be read as files
+        if not isinstance(image_data, bytes):
+            image_data = bytes(image_data)
+        return {
+            "files": {"frame": ("frame.jpg", image_data, "image/jpeg")},
+            "data": self._multipart_fields
+        }
 
     async def _compress_image(
         self,
-        image_data: bytes,
+        image_data: Union[bytes, bytearray, memoryview],
         max_dimension: int = 1024,
         quality: int = 85
-    ) -> bytes:
+    ) -> Union[bytes, bytearray, memoryview]:
         """
         Compress image to reduce bandwidth usage.
 
+        Decoding, resizing and re-encoding run on the client's compression
+        pool so they don't block the event loop; Pillow releases the GIL for
+        most of it.
+
         Args:
-            image_data: Original image bytes
+            image_data: Original image bytes (any bytes-like buffer)
             max_dimension: Maximum width/height in pixels
             quality: JPEG quality (1-100)
 
         Returns:
             Compressed image bytes
         """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._compress_pool, self._compress_image_sync, image_data, max_dimension, quality
+        )
+
+    def _compress_image_sync(
+        self,
+        image_data: Union[bytes, bytearray, memoryview],
+        max_dimension: int,
+        quality: int
+    ) -> Union[bytes, bytearray, memoryview]:
+        """Blocking implementation of _compress_image."""
+        # Already a small enough JPEG: send it as-is instead of decoding and
+        # re-encoding it for no size reduction. The size comes from the JPEG
+        # header, so Pillow doesn't get involved at all
+        size = jpeg_size(image_data)
+        if size is not None and max(size) <= max_dimension and len(image_data) <= PASSTHROUGH_MAX_BYTES:
+            return image_data
+
         try:
             image = Image.open(BytesIO(image_data))
 
-            # Convert RGBA to RGB if needed
-            if image.mode == 'RGBA':
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                background.paste(image, mask=image.split()[3])
-                image = background
+            # JPEGs (sized from their header above) can decode straight at
+            # 1/2, 1/4 or 1/8 scale via libjpeg's IDCT scaling, staying at least
+            # max_dimension. thumbnail's own draft targets 2x the size, which
+            # rules out scaling for typical phone frames
+            if size is not None:
+                image.draft('RGB', (max_dimension, max_dimension))
 
-            # Resize if too large
+            # Resize if too large. reducing_gap has Pillow box-reduce by an
+            # integer factor down to 2x the target first, so LANCZOS only runs
+            # over a small image where its quality matters
             if max(image.size) > max_dimension:
-                image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+                image.thumbnail(
+                    (max_dimension, max_dimension),
+                    Image.Resampling.LANCZOS,
+                    reducing_gap=2.0
+                )
+
+            # Convert RGBA to RGB if needed, flattening onto white in one
+            # compositing pass (after resizing, so over far fewer pixels)
+            if image.mode == 'RGBA':
+                background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+                image = Image.alpha_composite(background, image).convert('RGB')
 
             # Save to bytes with compression
             output = BytesIO()